@@ -1,17 +1,30 @@
 """
-Flask API for Mobile Bill Scanning System
+Quart (async Flask) API for Mobile Bill Scanning System
 """
+import asyncio
+import hashlib
+import io
 import os
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue, Empty
+from tempfile import SpooledTemporaryFile
+from uuid import uuid4
+import orjson
+from PIL import Image, ImageStat
+from quart import Quart, request, send_from_directory
+from quart_cors import cors
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.targets import BaseTarget
 from werkzeug.utils import secure_filename
 import config
-from ocr_extractor import OCRExtractor, TesseractOCRExtractor
+from ocr_extractor import OCRExtractor, TesseractOCRExtractor, BatchingOCRExtractor
 from bill_parser import BillParser
 from sheets_integration import GoogleSheetsIntegration
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for mobile apps
+app = Quart(__name__)
+app = cors(app)  # Enable CORS for mobile apps
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = config.MAX_CONTENT_LENGTH
@@ -34,19 +47,310 @@ except Exception as e:
         print(f"Tesseract OCR also not available: {e}")
         ocr_extractor = None
 
+# Batch concurrent Vision requests into single batchAnnotateImages RPCs
+batching_ocr = BatchingOCRExtractor(ocr_extractor) if use_google_vision else None
+
+def _tesseract_ocr(image_bytes):
+    """
+    Process-pool worker: run Tesseract OCR on image bytes
+
+    Lives at module level because a bound TesseractOCRExtractor method
+    cannot be pickled to the workers (the instance holds the pytesseract
+    module). Each worker builds its own extractor; the import inside it
+    is cached per process.
+    """
+    return TesseractOCRExtractor().extract_text_from_bytes(image_bytes)
+
+
+# Tesseract is CPU-bound (PIL decode + subprocess management under the
+# GIL), so its OCR calls run in worker processes to scale with cores
+_ocr_pool = (
+    ProcessPoolExecutor(max_workers=os.cpu_count())
+    if ocr_extractor is not None and not use_google_vision
+    else None
+)
+
 bill_parser = BillParser()
 
+# Shared Sheets client - constructing one per request would redo the
+# credential load, HTTP session setup and spreadsheet metadata fetch
+_sheets_client = None
+_sheets_client_lock = threading.Lock()
+
+
+def get_sheets_client():
+    """Return the shared GoogleSheetsIntegration, creating it on first use"""
+    global _sheets_client
+    if _sheets_client is None:
+        with _sheets_client_lock:
+            if _sheets_client is None:
+                # prefetch warms auth and the spreadsheet handle in the
+                # background so the first append doesn't pay cold start
+                _sheets_client = GoogleSheetsIntegration(prefetch=True)
+    return _sheets_client
+
+
+# Write-behind Sheets writer: process-bill enqueues rows and responds
+# immediately; a background thread flushes batches in single append
+# calls, decoupling client latency from Sheets latency and quota
+_SHEETS_FLUSH_MAX_ROWS = 100
+_SHEETS_FLUSH_WINDOW_SECONDS = 2.0
+_PENDING_MAX_ENTRIES = 4096
+
+_sheets_queue = Queue()
+_pending_bills = {}  # record id -> {'status': ..., 'data': ...}
+_sheets_writer_thread = None
+_sheets_writer_lock = threading.Lock()
+
+
+def _sheets_writer():
+    """Drain queued bills and append them to Sheets in batches"""
+    while True:
+        # Block until at least one bill arrives, then collect a batch
+        batch = [_sheets_queue.get()]
+        deadline = time.monotonic() + _SHEETS_FLUSH_WINDOW_SECONDS
+        while len(batch) < _SHEETS_FLUSH_MAX_ROWS:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(_sheets_queue.get(timeout=timeout))
+            except Empty:
+                break
+
+        try:
+            result = get_sheets_client().append_bills_batch(
+                [bill for _, bill in batch]
+            )
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+
+        for record_id, bill in batch:
+            if result.get('success'):
+                _pending_bills[record_id] = {
+                    'status': 'saved',
+                    'data': _public(bill)
+                }
+            else:
+                _pending_bills[record_id] = {
+                    'status': 'failed',
+                    'error': result.get('error'),
+                    'data': _public(bill)
+                }
+
+
+def enqueue_bill(bill_data):
+    """Queue a parsed bill for the background Sheets writer"""
+    global _sheets_writer_thread
+    if _sheets_writer_thread is None:
+        with _sheets_writer_lock:
+            if _sheets_writer_thread is None:
+                _sheets_writer_thread = threading.Thread(
+                    target=_sheets_writer, daemon=True
+                )
+                _sheets_writer_thread.start()
+
+    record_id = uuid4().hex
+    # Bound the status map the same way as the OCR cache
+    if len(_pending_bills) >= _PENDING_MAX_ENTRIES:
+        _pending_bills.pop(next(iter(_pending_bills)))
+    _pending_bills[record_id] = {'status': 'queued', 'data': _public(bill_data)}
+    _sheets_queue.put((record_id, bill_data))
+    return record_id
+
+
+@app.before_serving
+async def start_ocr_batching():
+    """Start the OCR batching task once the event loop is running"""
+    if batching_ocr is not None:
+        await batching_ocr.start()
+
+
+@app.after_serving
+async def stop_ocr_batching():
+    """Stop the OCR batching task on shutdown"""
+    if batching_ocr is not None:
+        await batching_ocr.stop()
+
+
+# OCR accuracy saturates well below full phone-camera resolution
+_MAX_IMAGE_EDGE = 2048
+
+
+def _shrink(image_bytes, max_edge=_MAX_IMAGE_EDGE):
+    """
+    Downscale and re-encode an uploaded image before OCR
+
+    Mobile clients send 4-12 MP photos; OCR gains nothing beyond ~2048 px
+    on the long edge, so resizing and JPEG-encoding at quality 85 cuts
+    the bytes sent to Vision 5-20x. Undecodable input is returned as-is
+    so the OCR layer reports the error.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        if max(image.size) <= max_edge and image.format == 'JPEG':
+            return image_bytes  # already a small JPEG - nothing to gain
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        image.convert('RGB').save(buf, 'JPEG', quality=85, optimize=True)
+        return buf.getvalue()
+    except Exception:
+        return image_bytes
+
+
+# Preflight thresholds for obviously useless captures
+_MIN_IMAGE_SIDE = 200
+_MIN_IMAGE_STDDEV = 5.0
+
+
+def _preflight_error(image_bytes):
+    """
+    Cheap local check that an upload could plausibly contain a bill
+
+    Accidental shutter taps produce tiny or near-uniform (black/white)
+    frames; a histogram stddev check costs microseconds versus a full
+    OCR round-trip and its quota hit.
+
+    Returns:
+        str: Error message for hopeless images, None when OCR should run
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        if min(image.size) < _MIN_IMAGE_SIDE:
+            return 'Image too small to contain a readable bill'
+        stat = ImageStat.Stat(image.convert('L'))
+        if stat.stddev[0] < _MIN_IMAGE_STDDEV:
+            return 'Image appears blank'
+    except Exception:
+        return None  # undecodable - let the OCR layer report it
+    return None
+
+
+# OCR result cache keyed by image content hash (mobile double-taps and
+# retries after Sheets failures re-upload byte-identical images)
+_ocr_cache = {}
+_OCR_CACHE_MAX_ENTRIES = 1024
+
+
+async def run_ocr(image_bytes):
+    """Run OCR off the event loop, batching Vision calls when possible
+
+    Results are cached by SHA-256 of the image bytes, so repeat uploads
+    of the same bill skip the OCR round-trip entirely.
+    """
+    key = hashlib.sha256(image_bytes).digest()
+    ocr_text = _ocr_cache.get(key)
+    if ocr_text is not None:
+        return ocr_text
+
+    # Shrink oversized photos before they hit the OCR engine
+    image_bytes = await asyncio.to_thread(_shrink, image_bytes)
+
+    if batching_ocr is not None:
+        ocr_text = await batching_ocr.extract_text_from_bytes(image_bytes)
+    elif _ocr_pool is not None:
+        ocr_text = await asyncio.get_running_loop().run_in_executor(
+            _ocr_pool, _tesseract_ocr, image_bytes
+        )
+    else:
+        ocr_text = await asyncio.to_thread(
+            ocr_extractor.extract_text_from_bytes, image_bytes
+        )
+
+    # Evict the oldest entry once the cache fills (dicts keep insertion order)
+    if len(_ocr_cache) >= _OCR_CACHE_MAX_ENTRIES:
+        _ocr_cache.pop(next(iter(_ocr_cache)))
+    _ocr_cache[key] = ocr_text
+    return ocr_text
+
+
+# Uploads up to this size stay in memory; larger ones spill to disk
+_SPOOL_MAX_BYTES = 1024 * 1024
 
-def allowed_file(filename):
-    """Check if file extension is allowed"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in config.ALLOWED_EXTENSIONS
+
+class _SpooledImageTarget(BaseTarget):
+    """Streaming-parser target that spools the image part to a temp file"""
+
+    def __init__(self):
+        super().__init__()
+        self.file = SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+
+    def on_data_received(self, chunk):
+        self.file.write(chunk)
+
+
+async def read_image_upload():
+    """
+    Stream the multipart request body and capture the 'image' part
+
+    The body is fed chunk-by-chunk into a streaming multipart parser, so
+    memory stays flat for large photos (past 1 MB the part spills to a
+    temp file) instead of buffering and re-parsing the whole request.
+
+    Returns:
+        tuple: (filename, spooled file) - filename is None when no
+            'image' part was present or the body is not valid multipart
+            form data
+    """
+    target = _SpooledImageTarget()
+    try:
+        parser = StreamingFormDataParser(headers=request.headers)
+        parser.register('image', target)
+
+        async for chunk in request.body:
+            parser.data_received(chunk)
+    except Exception:
+        # Non-multipart or malformed body - the callers' 'No image file
+        # provided' 400 covers it, as the Flask version did
+        return None, target.file
+
+    target.file.seek(0)
+    return target.multipart_filename, target.file
+
+
+# Magic numbers for the formats in ALLOWED_EXTENSIONS (PNG, JPEG, GIF,
+# BMP, TIFF little/big endian)
+_IMAGE_MAGIC = (b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'BM', b'II*\x00', b'MM\x00*')
+
+
+def allowed_file(filename, stream=None):
+    """
+    Check if the upload looks like an allowed image
+
+    The extension check is a single frozenset lookup; when a stream is
+    given its first bytes are also sniffed, so mislabelled uploads are
+    rejected here instead of wasting an OCR round-trip.
+    """
+    ext = os.path.splitext(filename)[1][1:].lower()
+    if ext not in config.ALLOWED_EXTENSIONS:
+        return False
+    if stream is not None:
+        head = stream.read(12)
+        stream.seek(0)
+        return head.startswith(_IMAGE_MAGIC)
+    return True
+
+
+def ojson(obj, status=200):
+    """Build a JSON response with orjson (C-level, far faster than stdlib)"""
+    return app.response_class(
+        orjson.dumps(obj), status=status, mimetype='application/json'
+    )
+
+
+# Fields from a parsed bill that are exposed in API responses
+_PUBLIC_FIELDS = ('invoice_no', 'bill_date', 'buyer', 'total_amount')
+
+
+def _public(bill_data):
+    """Project a parsed bill onto its public response fields"""
+    return {key: bill_data.get(key) for key in _PUBLIC_FIELDS}
 
 
 @app.route('/')
-def index():
+async def index():
     """API root endpoint"""
-    return jsonify({
+    return ojson({
         'service': 'Bill Scanning System',
         'version': '1.0',
         'status': 'active',
@@ -63,15 +367,15 @@ def index():
 
 
 @app.route('/mobile_test.html')
-def mobile_test():
+async def mobile_test():
     """Serve the mobile test interface"""
-    return send_from_directory('.', 'mobile_test.html')
+    return await send_from_directory('.', 'mobile_test.html')
 
 
 @app.route('/health')
-def health():
+async def health():
     """Health check endpoint"""
-    return jsonify({
+    return ojson({
         'status': 'healthy',
         'ocr_available': ocr_extractor is not None,
         'ocr_engine': 'Google Vision API' if use_google_vision else 'Tesseract OCR'
@@ -79,7 +383,7 @@ def health():
 
 
 @app.route('/api/scan-bill', methods=['POST'])
-def scan_bill():
+async def scan_bill():
     """
     Scan a bill image and return extracted data (without saving to sheets)
 
@@ -87,46 +391,55 @@ def scan_bill():
     Returns: JSON with extracted bill data
     """
     if ocr_extractor is None:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'OCR service not available'
-        }), 500
+        }, 500)
+
+    # Stream the multipart body instead of buffering it whole
+    filename, upload = await read_image_upload()
 
     # Check if image is in request
-    if 'image' not in request.files:
-        return jsonify({
+    if filename is None:
+        return ojson({
             'success': False,
             'error': 'No image file provided'
-        }), 400
-
-    file = request.files['image']
+        }, 400)
 
     # Check if file is selected
-    if file.filename == '':
-        return jsonify({
+    if filename == '':
+        return ojson({
             'success': False,
             'error': 'No file selected'
-        }), 400
+        }, 400)
 
     # Check if file is allowed
-    if not allowed_file(file.filename):
-        return jsonify({
+    if not allowed_file(filename, upload):
+        return ojson({
             'success': False,
             'error': f'File type not allowed. Allowed types: {", ".join(config.ALLOWED_EXTENSIONS)}'
-        }), 400
+        }, 400)
 
     try:
         # Read image bytes
-        image_bytes = file.read()
+        image_bytes = upload.read()
+
+        # Reject obviously useless captures before spending an OCR call
+        preflight_error = await asyncio.to_thread(_preflight_error, image_bytes)
+        if preflight_error:
+            return ojson({
+                'success': False,
+                'error': preflight_error
+            }, 400)
 
-        # Extract text using OCR
-        ocr_text = ocr_extractor.extract_text_from_bytes(image_bytes)
+        # Extract text using OCR (batched Vision RPC or worker thread)
+        ocr_text = await run_ocr(image_bytes)
 
         if not ocr_text:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'No text could be extracted from the image'
-            }), 400
+            }, 400)
 
         # Parse bill data
         bill_data = bill_parser.parse_bill(ocr_text)
@@ -134,14 +447,9 @@ def scan_bill():
         # Validate data
         is_valid, errors = bill_parser.validate_data(bill_data)
 
-        return jsonify({
+        return ojson({
             'success': True,
-            'data': {
-                'invoice_no': bill_data.get('invoice_no'),
-                'bill_date': bill_data.get('bill_date'),
-                'buyer': bill_data.get('buyer'),
-                'total_amount': bill_data.get('total_amount')
-            },
+            'data': _public(bill_data),
             'validation': {
                 'is_valid': is_valid,
                 'errors': errors
@@ -150,14 +458,14 @@ def scan_bill():
         })
 
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/api/process-bill', methods=['POST'])
-def process_bill():
+async def process_bill():
     """
     Complete workflow: Scan bill, extract data, and save to Google Sheets
 
@@ -165,44 +473,53 @@ def process_bill():
     Returns: JSON with processing result
     """
     if ocr_extractor is None:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': 'OCR service not available'
-        }), 500
+        }, 500)
+
+    # Stream the multipart body instead of buffering it whole
+    filename, upload = await read_image_upload()
 
     # Check if image is in request
-    if 'image' not in request.files:
-        return jsonify({
+    if filename is None:
+        return ojson({
             'success': False,
             'error': 'No image file provided'
-        }), 400
-
-    file = request.files['image']
+        }, 400)
 
-    if file.filename == '':
-        return jsonify({
+    if filename == '':
+        return ojson({
             'success': False,
             'error': 'No file selected'
-        }), 400
+        }, 400)
 
-    if not allowed_file(file.filename):
-        return jsonify({
+    if not allowed_file(filename, upload):
+        return ojson({
             'success': False,
             'error': f'File type not allowed. Allowed types: {", ".join(config.ALLOWED_EXTENSIONS)}'
-        }), 400
+        }, 400)
 
     try:
         # Read image bytes
-        image_bytes = file.read()
+        image_bytes = upload.read()
+
+        # Reject obviously useless captures before spending an OCR call
+        preflight_error = await asyncio.to_thread(_preflight_error, image_bytes)
+        if preflight_error:
+            return ojson({
+                'success': False,
+                'error': preflight_error
+            }, 400)
 
-        # Extract text using OCR
-        ocr_text = ocr_extractor.extract_text_from_bytes(image_bytes)
+        # Extract text using OCR (batched Vision RPC or worker thread)
+        ocr_text = await run_ocr(image_bytes)
 
         if not ocr_text:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'No text could be extracted from the image'
-            }), 400
+            }, 400)
 
         # Parse bill data
         bill_data = bill_parser.parse_bill(ocr_text)
@@ -211,85 +528,79 @@ def process_bill():
         is_valid, errors = bill_parser.validate_data(bill_data)
 
         if not is_valid:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'error': 'Data validation failed',
                 'validation_errors': errors,
-                'extracted_data': {
-                    'invoice_no': bill_data.get('invoice_no'),
-                    'bill_date': bill_data.get('bill_date'),
-                    'buyer': bill_data.get('buyer'),
-                    'total_amount': bill_data.get('total_amount')
-                }
-            }), 400
-
-        # Save to Google Sheets
-        sheets = GoogleSheetsIntegration()
-        result = sheets.append_bill_data(bill_data)
-
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'message': 'Bill processed and saved successfully',
-                'data': {
-                    'invoice_no': bill_data.get('invoice_no'),
-                    'bill_date': bill_data.get('bill_date'),
-                    'buyer': bill_data.get('buyer'),
-                    'total_amount': bill_data.get('total_amount')
-                },
-                'sheets_result': result,
-                'ocr_engine': 'Google Vision API' if use_google_vision else 'Tesseract OCR'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to save to Google Sheets',
-                'details': result.get('error'),
-                'extracted_data': {
-                    'invoice_no': bill_data.get('invoice_no'),
-                    'bill_date': bill_data.get('bill_date'),
-                    'buyer': bill_data.get('buyer'),
-                    'total_amount': bill_data.get('total_amount')
-                }
-            }), 500
+                'extracted_data': _public(bill_data)
+            }, 400)
+
+        # Hand the write to the background batch writer and respond now -
+        # the client's latency is just the OCR, not the Sheets append
+        record_id = enqueue_bill(bill_data)
+
+        return ojson({
+            'success': True,
+            'message': 'Bill accepted; saving to Google Sheets',
+            'record_id': record_id,
+            'status_url': f'/api/process-bill/{record_id}',
+            'data': _public(bill_data),
+            'ocr_engine': 'Google Vision API' if use_google_vision else 'Tesseract OCR'
+        }, 202)
 
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
+
+
+@app.route('/api/process-bill/<record_id>', methods=['GET'])
+async def process_bill_status(record_id):
+    """Check the save status of a previously accepted bill"""
+    record = _pending_bills.get(record_id)
+    if record is None:
+        return ojson({
+            'success': False,
+            'error': 'Unknown record id'
+        }, 404)
+    return ojson({
+        'success': True,
+        'record_id': record_id,
+        **record
+    })
 
 
 @app.route('/api/test-connection', methods=['GET'])
-def test_connection():
+async def test_connection():
     """Test Google Sheets connection"""
     try:
-        sheets = GoogleSheetsIntegration()
-        result = sheets.validate_connection()
-        return jsonify(result)
+        sheets = await asyncio.to_thread(get_sheets_client)
+        result = await asyncio.to_thread(sheets.validate_connection)
+        return ojson(result)
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/api/bills', methods=['GET'])
-def get_bills():
+async def get_bills():
     """Retrieve all bills from Google Sheets"""
     try:
-        sheets = GoogleSheetsIntegration()
-        bills = sheets.get_all_bills()
-        return jsonify({
+        sheets = await asyncio.to_thread(get_sheets_client)
+        bills = await asyncio.to_thread(sheets.get_all_bills)
+        return ojson({
             'success': True,
             'count': len(bills),
             'bills': bills
         })
     except Exception as e:
-        return jsonify({
+        return ojson({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 if __name__ == '__main__':
@@ -4,55 +4,155 @@ Bill Data Parser - Extracts structured data from OCR text
 import re
 from typing import Dict, Optional, Tuple, List
 
+# clean_number helpers: a C-level translation table strips the usual
+# currency formatting, and one compiled pattern drops anything else
+# that is not a digit or decimal point
+_NUM_TRANS = str.maketrans('', '', '₹Rs, \t\n')
+_NUM_KEEP = re.compile(r'[^\d.]')
+
 
 class BillParser:
     """Parse Tally bill text and extract required fields"""
 
-    def __init__(self):
-        """Initialize parser with regex patterns"""
-        # Patterns for extracting data
-        self.buyer_patterns = [
+    # Patterns for extracting data, compiled once at class definition so
+    # parse_bill never pays re-compilation cost per request and repeated
+    # BillParser construction is free
+    buyer_patterns = [
+        re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
             r'Buyer\s*\(Bill\s+to\)\s*\n([^\n]+)',
             r'Buyer\s*:\s*([^\n]+)',
             r'Bill\s+to\s*:\s*([^\n]+)',
-        ]
+        )
+    ]
 
-        self.invoice_patterns = [
+    invoice_patterns = [
+        re.compile(p, re.IGNORECASE) for p in (
             r'Invoice\s+No\.?\s*[:\s]*(\d+)',
             r'Invoice\s+Number\s*[:\s]*(\d+)',
             r'Bill\s+No\.?\s*[:\s]*(\d+)',
-        ]
+        )
+    ]
 
-        self.date_patterns = [
+    date_patterns = [
+        re.compile(p, re.IGNORECASE) for p in (
             r'Dated\s*\n\s*(\d{1,2}[-/]\w{3}[-/]\d{2,4})',  # 14-Oct-25
             r'Dated[:\s]+(\d{1,2}[-/]\w{3}[-/]\d{2,4})',
             r'Date[:\s]+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',  # 14/10/2025
             r'Invoice\s+No\.?\s+Dated\s*\n\s*\d+\s*\n\s*(\d{1,2}[-/]\w{3}[-/]\d{2,4})',  # Invoice No. Dated format
-        ]
+        )
+    ]
 
-        self.total_before_tax_patterns = [
+    total_before_tax_patterns = [
+        re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
             r'Taxable\s*Value\s*[:\s]*(\d+(?:,\d+)*(?:\.\d+)?)',
             r'Total\s*(?:before|without)\s*tax\s*[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
             r'Sub\s*Total\s*[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        ]
+        )
+    ]
 
-        self.cgst_patterns = [
+    cgst_patterns = [
+        re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
             r'CGST\s*[:\s]*(?:Rate\s*)?(?:\d+(?:\.\d+)?%?)?\s*(?:Amount\s*)?[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
             r'Central\s*GST\s*[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        ]
+        )
+    ]
 
-        self.sgst_patterns = [
+    sgst_patterns = [
+        re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
             r'SGST(?:/UTGST)?\s*[:\s]*(?:Rate\s*)?(?:\d+(?:\.\d+)?%?)?\s*(?:Amount\s*)?[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
             r'State\s*GST\s*[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
             r'UTGST\s*[:\s]*(?:Rate\s*)?(?:\d+(?:\.\d+)?%?)?\s*(?:Amount\s*)?[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        ]
+        )
+    ]
 
-        self.grand_total_patterns = [
+    grand_total_patterns = [
+        re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
             r'Total\s*Tax\s*Amount\s*[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
             r'Grand\s*Total\s*[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
             r'Total\s*[:\s]*(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)(?:\s*₹|\s*Rs\.?|\s*INR)?(?:\s*$|\s*\n)',
             r'Amount\s*Chargeable.*?\n.*?(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:₹|Rs\.?|INR)',
-        ]
+        )
+    ]
+
+    # One-off patterns previously compiled inline in the extract_* methods
+    _invoice_next_line = re.compile(
+        r'Invoice\s+No\.?.*?\n\s*(\d+)', re.IGNORECASE
+    )
+    _total_next_line = re.compile(
+        r'Total:\s*\n[^\n]*?\n\s*(\d+(?:,\d+)*\.\d+)', re.IGNORECASE
+    )
+    # Bounded lookahead windows (.{0,N}? instead of .*? with DOTALL)
+    # keep worst-case backtracking linear-ish on garbled OCR text that
+    # lacks the trailing anchor
+    _taxable_value = re.compile(
+        r'Taxable\s+Value.{0,500}?(\d+(?:,\d+)*\.\d+)\s+\d+(?:\.\d+)?%',
+        re.IGNORECASE | re.DOTALL
+    )
+    _total_same_line = re.compile(
+        r'Total:\s*(\d+(?:,\d+)*\.\d+)', re.IGNORECASE
+    )
+    _cgst_label = re.compile(
+        r'(?:^|\n)\s*CGST[^\d]*(\d+\.\d+)', re.MULTILINE
+    )
+    _sgst_label = re.compile(
+        r'(?:^|\n)\s*SGST[^\d]*(\d+\.\d+)', re.MULTILINE
+    )
+    _small_amount = re.compile(r'\b(\d+\.\d{2})\b')
+    _rupee_amount = re.compile(r'([\d,]+(?:\.\d+)?)\s*₹')
+    _chargeable_rupee = re.compile(
+        r'Amount\s+Chargeable\s*\(in\s+words\).{0,300}?([\d,]+(?:\.\d+)?)\s*₹',
+        re.IGNORECASE | re.DOTALL
+    )
+    _any_amount = re.compile(r'(\d+(?:\.\d+)?)')
+    _chargeable_label = re.compile(
+        r'amount\s+chargeable(\s*\(in\s+words\))?', re.IGNORECASE
+    )
+    # Master pattern: one alternation covering the common Tally layout
+    # for every field, so parse_bill can fill most of the result in a
+    # single linear scan. The per-field extract_* methods stay as
+    # fallbacks for the layouts the master pass does not cover.
+    _master = re.compile(
+        r'Invoice\s+No\.?[^\n]*\n\s*(?P<invoice>\d+)'
+        r'|Dated\s*:?\s*\n?\s*(?P<date>\d{1,2}[-/]\w{3}[-/]\d{2,4})'
+        r'|Buyer\s*\(Bill\s+to\)\s*\n(?P<buyer>[^\n]+)'
+        r'|(?P<chargeable>Amount\s+Chargeable\s*\(in\s+words\))'
+        r'|(?P<rupee>[\d,]+(?:\.\d+)?)\s*₹',
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+    def __init__(self):
+        """Initialize per-instance parse state"""
+        # Landmark memo for the most recently scanned text; per instance
+        # because it holds a reference to the caller's text
+        self._landmarks_memo = None
+
+    def _scan_landmarks(self, text: str) -> Dict:
+        """
+        Locate shared text landmarks in one pass per bill
+
+        The tax and total extractors all anchor on 'Total:' and 'Amount
+        Chargeable'; computing the offsets once avoids re-scanning the
+        text (and the full lowercase copy the old code made). The result
+        is memoized for the most recent text, so calling several
+        extractors on the same bill costs a single scan.
+
+        Args:
+            text (str): OCR text
+
+        Returns:
+            dict: Landmark offsets (-1 when a landmark is absent)
+        """
+        if self._landmarks_memo is not None and self._landmarks_memo[0] is text:
+            return self._landmarks_memo[1]
+
+        match = self._chargeable_label.search(text)
+        landmarks = {
+            'total_idx': text.rfind('Total:'),
+            'chargeable_idx': match.start() if match else -1,
+            'chargeable_in_words': bool(match and match.group(1)),
+        }
+        self._landmarks_memo = (text, landmarks)
+        return landmarks
 
     def clean_number(self, value: str) -> Optional[float]:
         """
@@ -68,10 +168,9 @@ class BillParser:
             return None
 
         try:
-            # Remove currency symbols, commas, and extra spaces (but NOT decimal points)
-            cleaned = re.sub(r'[₹Rs,\s]', '', value)
-            # Remove any non-numeric characters except decimal point
-            cleaned = re.sub(r'[^\d.]', '', cleaned)
+            # Strip currency symbols, commas and whitespace, then any other
+            # non-numeric characters except the decimal point
+            cleaned = _NUM_KEEP.sub('', value.translate(_NUM_TRANS))
 
             if cleaned:
                 return float(cleaned)
@@ -82,7 +181,7 @@ class BillParser:
     def extract_buyer(self, text: str) -> str:
         """Extract buyer/party name from text"""
         for pattern in self.buyer_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+            match = pattern.search(text)
             if match:
                 buyer = match.group(1).strip()
                 # Clean up the buyer name (remove extra info)
@@ -93,14 +192,13 @@ class BillParser:
     def extract_invoice_no(self, text: str) -> str:
         """Extract invoice number from text"""
         # Pattern 1: "Invoice No." with "Dated" on same line, number on next line
-        pattern1 = r'Invoice\s+No\.?.*?\n\s*(\d+)'
-        match = re.search(pattern1, text, re.IGNORECASE)
+        match = self._invoice_next_line.search(text)
         if match:
             return match.group(1).strip()
 
         # Pattern 2: "Invoice No: 123" on same line
         for pattern in self.invoice_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         return ""
@@ -108,7 +206,7 @@ class BillParser:
     def extract_bill_date(self, text: str) -> str:
         """Extract bill date from text"""
         for pattern in self.date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         return ""
@@ -116,24 +214,21 @@ class BillParser:
     def extract_total_before_tax(self, text: str) -> Optional[float]:
         """Extract total amount before tax"""
         # Pattern 1: "Total:" on one line, amount on next line
-        pattern1 = r'Total:\s*\n[^\n]*?\n\s*(\d+(?:,\d+)*\.\d+)'
-        match = re.search(pattern1, text, re.IGNORECASE)
+        match = self._total_next_line.search(text)
         if match:
             value = self.clean_number(match.group(1))
             if value and value > 0:
                 return value
 
         # Pattern 2: "Taxable Value" with amount in tax table
-        pattern2 = r'Taxable\s+Value.*?(\d+(?:,\d+)*\.\d+)\s+\d+(?:\.\d+)?%'
-        match = re.search(pattern2, text, re.IGNORECASE | re.DOTALL)
+        match = self._taxable_value.search(text)
         if match:
             value = self.clean_number(match.group(1))
             if value and value > 0:
                 return value
 
         # Pattern 3: Simple "Total:" followed by amount on same line
-        pattern3 = r'Total:\s*(\d+(?:,\d+)*\.\d+)'
-        match = re.search(pattern3, text, re.IGNORECASE)
+        match = self._total_same_line.search(text)
         if match:
             value = self.clean_number(match.group(1))
             if value and value > 0:
@@ -141,89 +236,124 @@ class BillParser:
 
         # Fallback to other patterns
         for pattern in self.total_before_tax_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+            match = pattern.search(text)
             if match:
                 value = self.clean_number(match.group(1))
                 if value and value > 0:
                     return value
         return None
 
-    def extract_cgst(self, text: str) -> Optional[float]:
+    def _tax_candidates(self, tail: str) -> List[float]:
+        """
+        Collect plausible tax amounts from the text after 'Total:'
+
+        One pass of the compiled pattern with direct float conversion;
+        the resulting list feeds both the CGST and SGST pickers.
+
+        Args:
+            tail (str): Text from the 'Total:' landmark onwards
+
+        Returns:
+            list: Decimal amounts in (0, 100000), in document order
+        """
+        candidates = []
+        for match in self._small_amount.finditer(tail):
+            value = float(match.group(1))
+            if 0 < value < 100000:
+                candidates.append(value)
+        return candidates
+
+    def _tax_candidates_for(self, text: str, landmarks: Dict) -> List[float]:
+        """
+        Return the tax candidates for a bill, scanning at most once
+
+        The list is stashed on the (memoized) landmarks dict, so calling
+        both extract_cgst and extract_sgst on one bill shares a single
+        scan instead of tokenizing and float-parsing the tail twice.
+        """
+        candidates = landmarks.get('tax_candidates')
+        if candidates is None:
+            candidates = self._tax_candidates(text[landmarks['total_idx']:])
+            landmarks['tax_candidates'] = candidates
+        return candidates
+
+    @staticmethod
+    def _pick_cgst(candidates: List[float]) -> Optional[float]:
+        """Pick the CGST amount out of the candidate tax amounts"""
+        if len(candidates) < 2:
+            return None
+        # CGST and SGST are usually equal and appear as a pair
+        for i in range(len(candidates) - 1):
+            if candidates[i] == candidates[i+1]:
+                return candidates[i]
+        # If no equal pair, the smallest is likely CGST
+        return sorted(candidates)[0]
+
+    @staticmethod
+    def _pick_sgst(candidates: List[float]) -> Optional[float]:
+        """Pick the SGST amount out of the candidate tax amounts"""
+        if len(candidates) < 2:
+            return None
+        # Look for two consecutive equal values; the second is SGST
+        for i in range(len(candidates) - 1):
+            if candidates[i] == candidates[i+1]:
+                return candidates[i+1]
+        # If no equal pair, the second smallest is likely SGST
+        return sorted(candidates)[1]
+
+    def extract_cgst(self, text: str, landmarks: Optional[Dict] = None) -> Optional[float]:
         """Extract CGST amount"""
         # Simple approach: Find all decimal numbers and look for patterns
         # In Tally bills, CGST appears in the bottom tax summary
         # Look for pattern where we have taxable value followed by two equal smaller amounts
 
         # First try: explicit CGST label
-        cgst_pattern = r'(?:^|\n)\s*CGST[^\d]*(\d+\.\d+)'
-        match = re.search(cgst_pattern, text, re.MULTILINE)
+        match = self._cgst_label.search(text)
         if match:
             value = self.clean_number(match.group(1))
             if value and 0 < value < 100000:
                 return value
 
-        # Second try: Look in tax summary - find smaller amounts after "Total:"
-        # Extract all decimal numbers after "Total:" keyword
-        total_idx = text.rfind('Total:')
+        # Second try: Look in tax summary - pick from the small decimal
+        # amounts (likely taxes) after the "Total:" keyword
+        if landmarks is None:
+            landmarks = self._scan_landmarks(text)
+        total_idx = landmarks['total_idx']
         if total_idx != -1:
-            after_total = text[total_idx:]
-            # Find all small decimal amounts (likely tax amounts)
-            amounts = re.findall(r'\b(\d+\.\d{2})\b', after_total)
-            # Filter for reasonable tax amounts (> 0, < 100000)
-            tax_amounts = [float(a) for a in amounts if 0 < float(a) < 100000]
-            # CGST and SGST are usually equal and appear as a pair
-            if len(tax_amounts) >= 2:
-                # Look for two consecutive equal values
-                for i in range(len(tax_amounts) - 1):
-                    if tax_amounts[i] == tax_amounts[i+1]:
-                        return tax_amounts[i]
-                # If no equal pair, return second smallest (likely CGST)
-                if len(tax_amounts) >= 2:
-                    sorted_amounts = sorted(tax_amounts)
-                    return sorted_amounts[0]  # Smallest is likely CGST
+            value = self._pick_cgst(self._tax_candidates_for(text, landmarks))
+            if value is not None:
+                return value
 
         # Fallback to other patterns
         for pattern in self.cgst_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
+            matches = pattern.finditer(text)
             for match in matches:
                 value = self.clean_number(match.group(1))
                 if value and value > 0:
                     return value
         return None
 
-    def extract_sgst(self, text: str) -> Optional[float]:
+    def extract_sgst(self, text: str, landmarks: Optional[Dict] = None) -> Optional[float]:
         """Extract SGST/UTGST amount"""
         # First try: explicit SGST label
-        sgst_pattern = r'(?:^|\n)\s*SGST[^\d]*(\d+\.\d+)'
-        match = re.search(sgst_pattern, text, re.MULTILINE)
+        match = self._sgst_label.search(text)
         if match:
             value = self.clean_number(match.group(1))
             if value and 0 < value < 100000:
                 return value
 
         # Second try: Same logic as CGST - find matching pair or smallest value
-        total_idx = text.rfind('Total:')
+        if landmarks is None:
+            landmarks = self._scan_landmarks(text)
+        total_idx = landmarks['total_idx']
         if total_idx != -1:
-            after_total = text[total_idx:]
-            amounts = re.findall(r'\b(\d+\.\d{2})\b', after_total)
-            tax_amounts = [float(a) for a in amounts if 0 < float(a) < 100000]
-            if len(tax_amounts) >= 2:
-                # Look for two consecutive equal values
-                for i in range(len(tax_amounts) - 1):
-                    if tax_amounts[i] == tax_amounts[i+1]:
-                        return tax_amounts[i+1]  # Return second one for SGST
-                # If no equal pair, return second smallest (likely SGST)
-                if len(tax_amounts) >= 2:
-                    sorted_amounts = sorted(tax_amounts)
-                    # If there are exactly 2 small values of same amount, return the second
-                    if len(sorted_amounts) >= 2 and sorted_amounts[0] == sorted_amounts[1]:
-                        return sorted_amounts[1]
-                    # Otherwise return second smallest
-                    return sorted_amounts[1] if len(sorted_amounts) > 1 else sorted_amounts[0]
+            value = self._pick_sgst(self._tax_candidates_for(text, landmarks))
+            if value is not None:
+                return value
 
         # Fallback to other patterns
         for pattern in self.sgst_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
+            matches = pattern.finditer(text)
             for match in matches:
                 value = self.clean_number(match.group(1))
                 if value and value > 0:
@@ -232,33 +362,38 @@ class BillParser:
 
     def extract_grand_total(self, text: str) -> Optional[float]:
         """Extract grand total (with tax)"""
-        # Look for the highest total value, typically the grand total
-        max_total = None
-
+        # The patterns capture overlapping fields ('Total Tax Amount' is
+        # not the grand total), so every match is collected and the
+        # largest amount wins - a first-hit short-circuit returns the
+        # tax line on bills that carry both
+        amounts = []
         for pattern in self.grand_total_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
+            for match in pattern.finditer(text):
                 value = self.clean_number(match.group(1))
                 if value and value > 0:
-                    if max_total is None or value > max_total:
-                        max_total = value
+                    amounts.append(value)
 
-        return max_total
+        if amounts:
+            return max(amounts)
+        return None
 
-    def extract_total_amount(self, text: str) -> Optional[float]:
+    def extract_total_amount(self, text: str, landmarks: Optional[Dict] = None) -> Optional[float]:
         """
         Extract total amount using 'Amount Chargeable (in words)' as reference
         This is the most reliable way to get the correct total
         """
+        if landmarks is None:
+            landmarks = self._scan_landmarks(text)
+        chargeable_idx = landmarks['chargeable_idx']
+
         # Pattern 1: Look for amount with ₹ symbol AFTER "Amount Chargeable (in words)"
         # This is the most reliable - the amount appears a few lines after the words
-        chargeable_idx = text.find('Amount Chargeable (in words)')
-        if chargeable_idx > 0:
+        if landmarks['chargeable_in_words'] and chargeable_idx > 0:
             # Look in the next 300 characters after "Amount Chargeable (in words)"
             after_section = text[chargeable_idx:chargeable_idx + 300]
             # Find amounts with ₹ symbol (like "280.00 ₹" or "3,102.00 ₹")
             # IMPORTANT: Include comma in the pattern to handle amounts like 3,102.00
-            amounts_with_rupee = re.findall(r'([\d,]+(?:\.\d+)?)\s*₹', after_section)
+            amounts_with_rupee = self._rupee_amount.findall(after_section)
             if amounts_with_rupee:
                 # The first amount with ₹ is usually the total
                 value = self.clean_number(amounts_with_rupee[0])
@@ -266,19 +401,17 @@ class BillParser:
                     return value
 
         # Pattern 2: Look for pattern "words\n...\nAmount ₹"
-        word_pattern = r'Amount\s+Chargeable\s*\(in\s+words\).*?([\d,]+(?:\.\d+)?)\s*₹'
-        match = re.search(word_pattern, text, re.IGNORECASE | re.DOTALL)
+        match = self._chargeable_rupee.search(text)
         if match:
             value = self.clean_number(match.group(1))
             if value and value > 0:
                 return value
 
         # Pattern 3: Search backwards from "Amount Chargeable" to find largest amount
-        chargeable_idx = text.lower().find('amount chargeable')
         if chargeable_idx > 0:
             # Look in the 500 characters before "Amount Chargeable"
             before_section = text[max(0, chargeable_idx - 500):chargeable_idx]
-            amounts = re.findall(r'(\d+(?:\.\d+)?)', before_section)
+            amounts = self._any_amount.findall(before_section)
             if amounts:
                 # Get the largest amount (likely the total)
                 amounts_float = [float(a) for a in amounts if float(a) > 10]
@@ -298,11 +431,50 @@ class BillParser:
         Returns:
             dict: Extracted bill data with validation
         """
-        # Extract required fields
-        invoice_no = self.extract_invoice_no(ocr_text)
-        bill_date = self.extract_bill_date(ocr_text)
-        buyer = self.extract_buyer(ocr_text)
-        total_amount = self.extract_total_amount(ocr_text)
+        # Single master pass: one scan of the text fills every field the
+        # common Tally layout provides, dispatching on the matched group
+        invoice_no = ""
+        bill_date = ""
+        buyer = ""
+        total_amount = None
+        chargeable_end = None
+
+        for match in self._master.finditer(ocr_text):
+            group = match.lastgroup
+            if group == 'invoice':
+                if not invoice_no:
+                    invoice_no = match.group('invoice').strip()
+            elif group == 'date':
+                if not bill_date:
+                    bill_date = match.group('date').strip()
+            elif group == 'buyer':
+                if not buyer:
+                    candidate = match.group('buyer').strip()
+                    # Clean up the buyer name (remove extra info)
+                    buyer = re.split(
+                        r'\n|Contact|Mobile|Phone', candidate, maxsplit=1
+                    )[0].strip()
+            elif group == 'chargeable':
+                chargeable_end = match.end()
+            elif group == 'rupee':
+                # First ₹ amount within 300 chars after "Amount Chargeable
+                # (in words)" is the total (same rule as extract_total_amount)
+                if (total_amount is None and chargeable_end is not None
+                        and match.start() - chargeable_end <= 300):
+                    value = self.clean_number(match.group('rupee'))
+                    if value and value > 10:
+                        total_amount = value
+
+        # Fall back to the per-field extractors for anything the master
+        # pass did not find
+        if not invoice_no:
+            invoice_no = self.extract_invoice_no(ocr_text)
+        if not bill_date:
+            bill_date = self.extract_bill_date(ocr_text)
+        if not buyer:
+            buyer = self.extract_buyer(ocr_text)
+        if total_amount is None:
+            total_amount = self.extract_total_amount(ocr_text)
 
         result = {
             'invoice_no': invoice_no,
@@ -314,8 +486,7 @@ class BillParser:
                 bill_date,
                 buyer,
                 total_amount is not None
-            ]),
-            'raw_text': ocr_text
+            ])
         }
 
         return result
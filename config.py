@@ -9,6 +9,9 @@ load_dotenv()
 # Google Cloud Vision API
 GOOGLE_CLOUD_CREDENTIALS = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', 'credentials.json')
 
+# GCS bucket used to stage large images for Vision (inline upload when unset)
+GCS_STAGING_BUCKET = os.getenv('GCS_STAGING_BUCKET', '')
+
 # Google Sheets Configuration
 GOOGLE_SHEETS_CREDENTIALS = os.getenv('GOOGLE_SHEETS_CREDENTIALS', 'sheets_credentials.json')
 SPREADSHEET_ID = os.getenv('SPREADSHEET_ID', '')
@@ -21,7 +24,7 @@ FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
 
 # Upload Configuration
 UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'})
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
 
 # OCR Configuration
@@ -1,12 +1,27 @@
 """
 OCR Text Extraction Module using Google Cloud Vision API
 """
+import asyncio
 import io
 import os
+import threading
+from uuid import uuid4
 from google.cloud import vision
 from PIL import Image
 import config
 
+# Images above this size are staged to GCS instead of sent inline in the RPC
+_VISION_INLINE_LIMIT = 2 * 1024 * 1024
+
+# Keepalive settings so idle channels survive between upload bursts
+# instead of being torn down and paying a fresh TLS handshake
+_GRPC_KEEPALIVE_OPTIONS = [
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 10000),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.keepalive_permit_without_calls', 1),
+]
+
 
 class OCRExtractor:
     """Extract text from bill images using Google Cloud Vision API"""
@@ -14,14 +29,97 @@ class OCRExtractor:
     def __init__(self):
         """Initialize the Vision API client"""
         os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = config.GOOGLE_CLOUD_CREDENTIALS
-        self.client = vision.ImageAnnotatorClient()
+        transport = self._build_transport()
+        if transport is not None:
+            self.client = vision.ImageAnnotatorClient(transport=transport)
+        else:
+            self.client = vision.ImageAnnotatorClient()
+        self._storage_client = None
+
+    @staticmethod
+    def _build_transport():
+        """
+        Build a gRPC transport with keepalive enabled
+
+        The default channel lets idle connections drop, so intermittent
+        traffic pays a full TLS handshake (hundreds of ms) on each burst.
+
+        Returns:
+            ImageAnnotatorGrpcTransport: Tuned transport, or None to use
+                the library default
+        """
+        try:
+            from google.api_core import grpc_helpers
+            from google.cloud.vision_v1.services.image_annotator.transports import (
+                ImageAnnotatorGrpcTransport,
+            )
+            channel = grpc_helpers.create_channel(
+                'vision.googleapis.com:443',
+                scopes=('https://www.googleapis.com/auth/cloud-platform',),
+                options=_GRPC_KEEPALIVE_OPTIONS,
+            )
+            return ImageAnnotatorGrpcTransport(channel=channel)
+        except Exception:
+            # Keepalive is an optimization - the default transport still works
+            return None
+
+    def _build_image(self, image_bytes):
+        """
+        Build the vision.Image for a request, staging large payloads to GCS
+
+        Inline content is serialized into the gRPC body, which doubles
+        memory and stalls on upload bandwidth for multi-MB photos. When a
+        staging bucket is configured and the image exceeds the inline
+        limit, upload it to GCS and reference it by URI instead.
+
+        Args:
+            image_bytes (bytes): Image data as bytes
+
+        Returns:
+            tuple: (vision.Image, staged blob or None)
+        """
+        if not config.GCS_STAGING_BUCKET or len(image_bytes) <= _VISION_INLINE_LIMIT:
+            return vision.Image(content=image_bytes), None
+
+        try:
+            from google.cloud import storage
+            if self._storage_client is None:
+                self._storage_client = storage.Client()
+            bucket = self._storage_client.bucket(config.GCS_STAGING_BUCKET)
+            blob = bucket.blob(f'staging/{uuid4().hex}')
+            blob.upload_from_string(
+                image_bytes, content_type='application/octet-stream'
+            )
+        except Exception:
+            # Staging is an optimization - fall back to inline content
+            return vision.Image(content=image_bytes), None
+
+        image = vision.Image(
+            source=vision.ImageSource(
+                image_uri=f'gs://{config.GCS_STAGING_BUCKET}/{blob.name}'
+            )
+        )
+        return image, blob
+
+    @staticmethod
+    def _cleanup_staged(blob):
+        """Delete a staged blob in the background after the response"""
+        def _delete():
+            try:
+                blob.delete()
+            except Exception:
+                pass  # staging objects can also be reaped by a bucket lifecycle rule
+
+        threading.Thread(target=_delete, daemon=True).start()
 
-    def extract_text_from_image(self, image_path):
+    def extract_text_from_image(self, image_path, max_chars=None):
         """
         Extract text from an image file
 
         Args:
             image_path (str): Path to the image file
+            max_chars (int): Truncate the result to this many characters
+                (for debug/preview callers that never use the full text)
 
         Returns:
             str: Extracted text from the image
@@ -48,6 +146,8 @@ class OCRExtractor:
             if texts:
                 # The first annotation contains all detected text
                 extracted_text = texts[0].description
+                if max_chars is not None:
+                    return extracted_text[:max_chars]
                 return extracted_text
             else:
                 return ""
@@ -55,6 +155,58 @@ class OCRExtractor:
         except Exception as e:
             raise Exception(f'OCR Extraction Error: {str(e)}')
 
+    # batchAnnotateImages accepts at most this many images per request
+    _BATCH_LIMIT = 16
+
+    def extract_text_from_images(self, image_paths):
+        """
+        Extract text from several image files with batched RPCs
+
+        Images go to the API in chunks of 16 (the batchAnnotateImages
+        limit), so a large photo set costs one HTTPS round-trip per
+        chunk instead of one per image.
+
+        Args:
+            image_paths (list): Paths to the image files
+
+        Yields:
+            tuple: (image_path, extracted text) in input order; a
+                per-image Vision error yields the exception in place of
+                the text so one bad image doesn't abort the batch
+        """
+        paths = list(image_paths)
+        for start in range(0, len(paths), self._BATCH_LIMIT):
+            chunk = paths[start:start + self._BATCH_LIMIT]
+            requests = []
+            for path in chunk:
+                with io.open(path, 'rb') as image_file:
+                    content = image_file.read()
+                requests.append(
+                    vision.AnnotateImageRequest(
+                        image=vision.Image(content=content),
+                        features=[
+                            vision.Feature(
+                                type_=vision.Feature.Type.TEXT_DETECTION
+                            )
+                        ],
+                        image_context={
+                            'language_hints': config.OCR_LANGUAGE_HINTS
+                        },
+                    )
+                )
+
+            response = self.client.batch_annotate_images(requests=requests)
+
+            for path, annotated in zip(chunk, response.responses):
+                if annotated.error.message:
+                    yield path, Exception(
+                        f'Google Vision API Error: {annotated.error.message}'
+                    )
+                elif annotated.text_annotations:
+                    yield path, annotated.text_annotations[0].description
+                else:
+                    yield path, ""
+
     def extract_text_from_bytes(self, image_bytes):
         """
         Extract text from image bytes (for uploaded files)
@@ -65,8 +217,9 @@ class OCRExtractor:
         Returns:
             str: Extracted text from the image
         """
+        staged_blob = None
         try:
-            image = vision.Image(content=image_bytes)
+            image, staged_blob = self._build_image(image_bytes)
 
             # Perform text detection
             response = self.client.text_detection(
@@ -87,6 +240,134 @@ class OCRExtractor:
 
         except Exception as e:
             raise Exception(f'OCR Extraction Error: {str(e)}')
+        finally:
+            if staged_blob is not None:
+                self._cleanup_staged(staged_blob)
+
+
+class BatchingOCRExtractor:
+    """
+    Coalesce concurrent OCR requests into single batch_annotate_images calls
+
+    Vision accepts up to 16 images per batchAnnotateImages request, so
+    requests that arrive within a short window share one RPC instead of
+    paying a full network round-trip each.
+    """
+
+    MAX_BATCH_SIZE = 16  # documented batchAnnotateImages limit
+    BATCH_WINDOW_SECONDS = 0.02
+
+    def __init__(self, extractor=None):
+        """
+        Initialize the batching layer
+
+        Args:
+            extractor (OCRExtractor): Underlying extractor whose Vision
+                client is reused (a new one is created if not given)
+        """
+        self.extractor = extractor or OCRExtractor()
+        self.client = self.extractor.client
+        self._queue = asyncio.Queue()
+        self._drain_task = None
+
+    async def start(self):
+        """Start the background task that drains the request queue"""
+        if self._drain_task is None:
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def stop(self):
+        """Stop the background drain task"""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            try:
+                await self._drain_task
+            except asyncio.CancelledError:
+                pass
+            self._drain_task = None
+
+    async def extract_text_from_bytes(self, image_bytes):
+        """
+        Extract text from image bytes, batching with concurrent callers
+
+        Args:
+            image_bytes (bytes): Image data as bytes
+
+        Returns:
+            str: Extracted text from the image
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image_bytes, future))
+        return await future
+
+    async def _drain(self):
+        """Collect queued requests into batches and dispatch them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # Block until at least one request arrives
+            batch = [await self._queue.get()]
+
+            # Collect more requests until the batch fills or the window closes
+            deadline = loop.time() + self.BATCH_WINDOW_SECONDS
+            while len(batch) < self.MAX_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await asyncio.to_thread(
+                    self._annotate_batch, [content for content, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            # Responses come back in request order; map them to futures by index
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _annotate_batch(self, images):
+        """
+        Annotate a batch of images with a single Vision RPC
+
+        Args:
+            images (list): Image payloads as bytes
+
+        Returns:
+            list: Extracted text per image (or an Exception for that image)
+        """
+        requests = [
+            vision.AnnotateImageRequest(
+                image=vision.Image(content=content),
+                features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)],
+                image_context={'language_hints': config.OCR_LANGUAGE_HINTS},
+            )
+            for content in images
+        ]
+
+        response = self.client.batch_annotate_images(requests=requests)
+
+        results = []
+        for annotated in response.responses:
+            if annotated.error.message:
+                results.append(
+                    Exception(f'Google Vision API Error: {annotated.error.message}')
+                )
+            elif annotated.text_annotations:
+                results.append(annotated.text_annotations[0].description)
+            else:
+                results.append("")
+        return results
 
 
 # Alternative: Tesseract OCR implementation (fallback option)
@@ -100,11 +381,13 @@ class TesseractOCRExtractor:
         except ImportError:
             raise ImportError("pytesseract not installed. Run: pip install pytesseract")
 
-    def extract_text_from_image(self, image_path):
+    def extract_text_from_image(self, image_path, max_chars=None):
         """Extract text from image using Tesseract"""
         try:
             image = Image.open(image_path)
             text = self.pytesseract.image_to_string(image, lang='eng')
+            if max_chars is not None:
+                return text[:max_chars]
             return text
         except Exception as e:
             raise Exception(f'Tesseract OCR Error: {str(e)}')
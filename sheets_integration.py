@@ -1,42 +1,239 @@
 """
 Google Sheets Integration Module
 """
+import functools
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from google.oauth2 import service_account
 from datetime import datetime
 import config
 
+# How long cached get_all_bills results stay fresh
+_READ_CACHE_TTL_SECONDS = 300
+
+# First row index in an A1 range like 'Bills!A42:E43'
+_UPDATED_RANGE_ROW = re.compile(r'![A-Z]+(\d+)')
+
+# Grid rows added at a time when a batch write would outgrow the sheet
+_GRID_GROW_CHUNK = 256
+
+# Define the scope
+_SCOPES = [
+    'https://spreadsheets.google.com/feeds',
+    'https://www.googleapis.com/auth/drive'
+]
+
+
+def _mount_pooled_adapter(client):
+    """
+    Mount a pooled adapter with retries on the client's HTTP session
+
+    The default session opens short-lived connections, so every small
+    append pays a fresh TLS handshake. A keep-alive pool reuses the
+    connection across calls, and transient 429/5xx responses are
+    retried with backoff at the transport layer.
+    """
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+    adapter = HTTPAdapter(
+        pool_connections=10, pool_maxsize=20, max_retries=retry
+    )
+    session = getattr(client, 'http_client', client).session
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+# Transient statuses worth retrying at the API layer
+_RETRY_STATUSES = frozenset({429, 500, 502, 503})
+_MAX_RETRIES = 6
+
+
+def _retry_on_quota(fn):
+    """
+    Retry a Sheets call on 429/5xx with exponential backoff and jitter
+
+    Sheets enforces a per-minute write quota; retrying immediately only
+    deepens the throttle, while backing off with jitter keeps throughput
+    near the quota ceiling. Honors Retry-After when the server sends it.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(_MAX_RETRIES):
+            try:
+                return fn(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                status = e.response.status_code
+                if status not in _RETRY_STATUSES or attempt == _MAX_RETRIES - 1:
+                    raise
+                try:
+                    delay = float(e.response.headers.get('Retry-After', ''))
+                except (TypeError, ValueError):
+                    delay = (2 ** attempt) * 0.5
+                time.sleep(delay + random.random() * 0.3)
+    return wrapper
+
+
+# Background executor used to warm spreadsheet handles off the caller's path
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix='sheets-prefetch'
+)
+
+# Authorized clients shared across instances, keyed by credentials path.
+# The lock keeps concurrent first accesses from double-authorizing.
+_client_cache = {}
+_client_cache_lock = threading.Lock()
+
+
+def _build_client(credentials_path):
+    """
+    Authorize a gspread client, cached per credentials file
+
+    Reading the keyfile and signing the JWT cost hundreds of ms, so
+    repeated GoogleSheetsIntegration instances share one client.
+    google-auth refreshes the access token lazily and keeps it on the
+    credentials object, so the JWT exchange happens once per expiry
+    window rather than once per instance.
+    """
+    with _client_cache_lock:
+        client = _client_cache.get(credentials_path)
+        if client is None:
+            creds = service_account.Credentials.from_service_account_file(
+                credentials_path, scopes=_SCOPES
+            )
+            client = gspread.authorize(creds)
+            _mount_pooled_adapter(client)
+            _client_cache[credentials_path] = client
+        return client
+
 
 class GoogleSheetsIntegration:
     """Handle Google Sheets operations"""
 
-    def __init__(self, credentials_path=None, spreadsheet_id=None):
+    def __init__(self, credentials_path=None, spreadsheet_id=None,
+                 batch_size=1, prefetch=False):
         """
         Initialize Google Sheets client
 
         Args:
             credentials_path (str): Path to service account credentials JSON
             spreadsheet_id (str): Google Sheets spreadsheet ID
+            batch_size (int): Number of rows to buffer before a flush.
+                The default of 1 writes every bill immediately, matching
+                the old per-row behavior; larger values coalesce appends
+                into single append_rows requests.
+            prefetch (bool): Start authorizing and opening the
+                spreadsheet on a background thread immediately, so the
+                first API call doesn't pay the cold-start round-trips.
         """
         self.credentials_path = credentials_path or config.GOOGLE_SHEETS_CREDENTIALS
         self.spreadsheet_id = spreadsheet_id or config.SPREADSHEET_ID
+        self.batch_size = batch_size
 
-        # Define the scope
-        self.scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/drive'
-        ]
+        # Rows buffered for the next flush
+        self._pending_rows = []
 
-        # Authorize and create client
-        try:
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                self.credentials_path, self.scope
+        # Read cache: sheet_name -> (fetch time, records). The lock is held
+        # across the fetch so concurrent readers don't stampede the API.
+        self._bills_cache = {}
+        self._bills_cache_lock = threading.Lock()
+
+        # Worksheet handles looked up once per sheet name, not per call
+        self._worksheet_cache = {}
+
+        # Last data row per worksheet title, learned from append
+        # responses and used to preallocate grid capacity
+        self._data_rows = {}
+
+        # Client and spreadsheet are built lazily so constructing the
+        # object costs no network round-trip
+        self._client = None
+        self._spreadsheet = None
+
+        # Optional warm-up: run the auth and open_by_key round-trips in
+        # the background; the spreadsheet property collects the result
+        self._spreadsheet_future = None
+        if prefetch:
+            self._spreadsheet_future = _PREFETCH_EXECUTOR.submit(
+                lambda: self.client.open_by_key(self.spreadsheet_id)
             )
-            self.client = gspread.authorize(creds)
-            self.spreadsheet = self.client.open_by_key(self.spreadsheet_id)
-        except Exception as e:
-            raise Exception(f'Google Sheets Authentication Error: {str(e)}')
 
+    @property
+    def client(self):
+        """Authorized gspread client, created on first use"""
+        if self._client is None:
+            try:
+                self._client = _build_client(self.credentials_path)
+            except Exception as e:
+                raise Exception(f'Google Sheets Authentication Error: {str(e)}')
+        return self._client
+
+    @property
+    def spreadsheet(self):
+        """Spreadsheet handle, opened on first use"""
+        if self._spreadsheet is None and self._spreadsheet_future is not None:
+            future, self._spreadsheet_future = self._spreadsheet_future, None
+            try:
+                self._spreadsheet = future.result()
+            except Exception:
+                pass  # fall through to the synchronous open below
+        if self._spreadsheet is None:
+            try:
+                self._spreadsheet = self.client.open_by_key(self.spreadsheet_id)
+            except Exception as e:
+                raise Exception(f'Google Sheets Authentication Error: {str(e)}')
+        return self._spreadsheet
+
+    @_retry_on_quota
+    def _append_rows(self, worksheet, rows):
+        """
+        Append rows, retrying transient quota/server errors
+
+        RAW skips the server-side parse USER_ENTERED would run on every
+        cell; nothing in a bill row needs formula or locale
+        interpretation - the timestamp is already canonical and the
+        total is already numeric.
+
+        When the batch would outgrow the grid, rows are preallocated in
+        chunks first: letting the server grow the sheet implicitly pays
+        that work on every boundary-crossing append.
+        """
+        key = worksheet.title
+        last_row = self._data_rows.get(key)
+        if last_row is not None:
+            needed = last_row + len(rows) - worksheet.row_count
+            if needed > 0:
+                # Over-allocate so many batches share one resize
+                worksheet.add_rows(max(needed, _GRID_GROW_CHUNK))
+
+        response = worksheet.append_rows(
+            rows,
+            value_input_option='RAW',
+            insert_data_option='INSERT_ROWS'
+        )
+
+        # Remember where the data now ends for the next capacity check
+        updated_range = response.get('updates', {}).get('updatedRange', '')
+        match = _UPDATED_RANGE_ROW.search(updated_range)
+        if match:
+            self._data_rows[key] = int(match.group(1)) + len(rows) - 1
+
+        return response
+
+    @_retry_on_quota
+    def _fetch_values(self, worksheet):
+        """Fetch the data columns, retrying transient quota/server errors"""
+        return worksheet.get('A:E')
+
+    @_retry_on_quota
     def get_or_create_sheet(self, sheet_name=None):
         """
         Get worksheet by name or create if doesn't exist
@@ -49,30 +246,106 @@ class GoogleSheetsIntegration:
         """
         sheet_name = sheet_name or config.SHEET_NAME
 
+        cached = self._worksheet_cache.get(sheet_name)
+        if cached is not None:
+            return cached
+
         try:
             worksheet = self.spreadsheet.worksheet(sheet_name)
         except gspread.exceptions.WorksheetNotFound:
-            # Create new worksheet with headers
-            worksheet = self.spreadsheet.add_worksheet(
-                title=sheet_name,
-                rows=1000,
-                cols=10
-            )
-            # Add headers
-            headers = [
-                'Scan Date',
-                'Invoice No',
-                'Bill Date',
-                'Buyer',
-                'Total Amount'
-            ]
-            worksheet.append_row(headers)
+            worksheet = self._create_sheet_with_headers(sheet_name)
 
+        self._worksheet_cache[sheet_name] = worksheet
         return worksheet
 
+    # Header row written when a sheet is first created
+    _HEADERS = [
+        'Scan Date',
+        'Invoice No',
+        'Bill Date',
+        'Buyer',
+        'Total Amount'
+    ]
+
+    def _create_sheet_with_headers(self, sheet_name):
+        """
+        Create a worksheet and write its header row in one batch_update
+
+        The addSheet and header updateCells requests share a single
+        batch, so first-run initialization costs one round-trip instead
+        of two. The sheetId is chosen client-side so the header write
+        can reference the new sheet inside the same batch.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+
+        Returns:
+            gspread.Worksheet: The new worksheet object
+        """
+        sheet_id = random.randrange(1, 2 ** 31)
+        properties = {
+            'sheetId': sheet_id,
+            'title': sheet_name,
+            'gridProperties': {'rowCount': 1000, 'columnCount': 10}
+        }
+        self.spreadsheet.batch_update({
+            'requests': [
+                {'addSheet': {'properties': properties}},
+                {
+                    'updateCells': {
+                        'start': {
+                            'sheetId': sheet_id,
+                            'rowIndex': 0,
+                            'columnIndex': 0
+                        },
+                        'rows': [{
+                            'values': [
+                                {'userEnteredValue': {'stringValue': header}}
+                                for header in self._HEADERS
+                            ]
+                        }],
+                        'fields': 'userEnteredValue'
+                    }
+                }
+            ]
+        })
+
+        try:
+            # The properties are fully known client-side, so the handle
+            # can be built without another metadata fetch
+            return gspread.worksheet.Worksheet(
+                self.spreadsheet.id, self.client.http_client, properties
+            )
+        except Exception:
+            return self.spreadsheet.worksheet(sheet_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Push out any partially filled batch
+        self.flush()
+        return False
+
+    @staticmethod
+    def _build_row(bill_data, scan_date):
+        """Build a sheet row from parsed bill data"""
+        return [
+            scan_date,
+            bill_data.get('invoice_no', ''),
+            bill_data.get('bill_date', ''),
+            bill_data.get('buyer', ''),
+            bill_data.get('total_amount', 0)
+        ]
+
     def append_bill_data(self, bill_data, sheet_name=None):
         """
-        Append bill data as a new row in Google Sheets
+        Queue bill data for append, flushing when the batch fills
+
+        With the default batch_size of 1 every call writes immediately.
+        Larger batch sizes buffer rows so N bills cost one append_rows
+        round-trip instead of N; call flush() (or use the instance as a
+        context manager) to push out a partial batch.
 
         Args:
             bill_data (dict): Parsed bill data with keys:
@@ -83,57 +356,244 @@ class GoogleSheetsIntegration:
             sheet_name (str): Name of the worksheet
 
         Returns:
-            dict: Result with success status and row number
+            dict: Result with success status and row number (or pending
+                count when the row was only buffered)
+        """
+        scan_date = datetime.now().isoformat(sep=' ', timespec='seconds')
+        self._pending_rows.append(self._build_row(bill_data, scan_date))
+
+        if len(self._pending_rows) >= self.batch_size:
+            return self.flush(sheet_name)
+
+        return {
+            'success': True,
+            'pending_rows': len(self._pending_rows),
+            'message': f'Row buffered ({len(self._pending_rows)}/{self.batch_size})'
+        }
+
+    def flush(self, sheet_name=None):
         """
+        Write all buffered rows in a single append_rows request
+
+        Args:
+            sheet_name (str): Name of the worksheet
+
+        Returns:
+            dict: Result with success status and the first appended row
+        """
+        if not self._pending_rows:
+            return {'success': True, 'rows_appended': 0, 'message': 'Nothing to flush'}
+
+        rows, self._pending_rows = self._pending_rows, []
         try:
             worksheet = self.get_or_create_sheet(sheet_name)
 
-            # Prepare row data
-            scan_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            row_data = [
-                scan_date,
-                bill_data.get('invoice_no', ''),
-                bill_data.get('bill_date', ''),
-                bill_data.get('buyer', ''),
-                bill_data.get('total_amount', 0)
-            ]
+            response = self._append_rows(worksheet, rows)
 
-            # Append the row
-            worksheet.append_row(row_data, value_input_option='USER_ENTERED')
+            # The append response already reports where the rows landed
+            # (updates.updatedRange), so no extra call is needed for the
+            # row number - and unlike row_count it reflects actual data
+            updated_range = response.get('updates', {}).get('updatedRange', '')
+            match = _UPDATED_RANGE_ROW.search(updated_range)
+            row_number = int(match.group(1)) if match else None
 
-            # Get the row number
-            row_number = len(worksheet.get_all_values())
+            # New rows make any cached read stale
+            with self._bills_cache_lock:
+                self._bills_cache.pop(sheet_name or config.SHEET_NAME, None)
 
             return {
                 'success': True,
                 'row_number': row_number,
+                'rows_appended': len(rows),
                 'message': f'Data appended to row {row_number}'
             }
 
         except Exception as e:
+            # Keep the rows queued so a later flush can retry them
+            self._pending_rows = rows + self._pending_rows
             return {
                 'success': False,
                 'error': str(e),
                 'message': f'Failed to append data: {str(e)}'
             }
 
-    def get_all_bills(self, sheet_name=None):
+    def append_bills_batch(self, bills, sheet_name=None):
         """
-        Retrieve all bills from the sheet
+        Append several bills in a single Sheets request
 
         Args:
+            bills (list): Parsed bill dicts (same keys as append_bill_data)
             sheet_name (str): Name of the worksheet
 
         Returns:
-            list: List of bill records
+            dict: Result with success status and appended row count
         """
+        if not bills:
+            return {'success': True, 'rows_appended': 0}
+
         try:
             worksheet = self.get_or_create_sheet(sheet_name)
-            records = worksheet.get_all_records()
-            return records
+
+            scan_date = datetime.now().isoformat(sep=' ', timespec='seconds')
+            rows = [self._build_row(bill, scan_date) for bill in bills]
+
+            # One append call regardless of batch size
+            self._append_rows(worksheet, rows)
+
+            # New rows make any cached read stale
+            with self._bills_cache_lock:
+                self._bills_cache.pop(sheet_name or config.SHEET_NAME, None)
+
+            return {
+                'success': True,
+                'rows_appended': len(rows),
+                'message': f'Appended {len(rows)} rows'
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'message': f'Failed to append batch: {str(e)}'
+            }
+
+    def iter_bills(self, sheet_name=None):
+        """
+        Yield bill records one at a time
+
+        One range read fetches the raw values, but the per-row dicts are
+        built lazily, avoiding get_all_records' up-front list-of-dicts
+        allocation when the caller only streams over the rows.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+
+        Yields:
+            dict: One bill record per data row
+        """
+        worksheet = self.get_or_create_sheet(sheet_name)
+        values = self._fetch_values(worksheet)
+        if not values:
+            return
+
+        headers = values[0]
+        for row in values[1:]:
+            # The API drops trailing empty cells, so pad short rows
+            row = row + [''] * (len(headers) - len(row))
+            yield dict(zip(headers, row))
+
+    def append_bills_df(self, bills_df, sheet_name=None):
+        """
+        Append a DataFrame of parsed bills in a single Sheets request
+
+        Accepts the columns append_bill_data reads from a dict
+        (invoice_no, bill_date, buyer, total_amount); one shared
+        scan_date is stamped on the whole batch.
+
+        Args:
+            bills_df (pandas.DataFrame): Parsed bills, one per row
+            sheet_name (str): Name of the worksheet
+
+        Returns:
+            dict: Result with success status and appended row count
+        """
+        if bills_df.empty:
+            return {'success': True, 'rows_appended': 0}
+
+        try:
+            worksheet = self.get_or_create_sheet(sheet_name)
+
+            # Build rows like _build_row does, keeping the total numeric
+            # so the RAW append stores a number, not text
+            scan_date = datetime.now().isoformat(sep=' ', timespec='seconds')
+            rows = []
+            for bill in bills_df.to_dict('records'):
+                row = self._build_row(bill, scan_date)
+                # numpy scalars don't JSON-serialize; unwrap to native
+                if hasattr(row[-1], 'item'):
+                    row[-1] = row[-1].item()
+                rows.append(row)
+
+            self._append_rows(worksheet, rows)
+
+            # New rows make any cached read stale
+            with self._bills_cache_lock:
+                self._bills_cache.pop(sheet_name or config.SHEET_NAME, None)
+
+            return {
+                'success': True,
+                'rows_appended': len(rows),
+                'message': f'Appended {len(rows)} rows'
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'message': f'Failed to append batch: {str(e)}'
+            }
+
+    def get_all_bills_df(self, sheet_name=None):
+        """
+        Retrieve all bills as a pandas DataFrame
+
+        Typed columns pack into contiguous arrays instead of one dict
+        per row, which is both smaller and ready for analytics callers.
+
+        Args:
+            sheet_name (str): Name of the worksheet
+
+        Returns:
+            pandas.DataFrame: All bill rows, with the amount column
+                numeric and the scan date parsed
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas not installed. Run: pip install pandas")
+
+        try:
+            worksheet = self.get_or_create_sheet(sheet_name)
+            values = self._fetch_values(worksheet)
         except Exception as e:
             raise Exception(f'Error retrieving bills: {str(e)}')
 
+        if not values:
+            return pd.DataFrame(columns=self._HEADERS)
+
+        df = pd.DataFrame(values[1:], columns=values[0])
+        if 'Total Amount' in df.columns:
+            df['Total Amount'] = pd.to_numeric(
+                df['Total Amount'], errors='coerce'
+            )
+        if 'Scan Date' in df.columns:
+            df['Scan Date'] = pd.to_datetime(df['Scan Date'], errors='coerce')
+        return df
+
+    def get_all_bills(self, sheet_name=None):
+        """
+        Retrieve all bills from the sheet (cached for a few minutes)
+
+        Args:
+            sheet_name (str): Name of the worksheet
+
+        Returns:
+            list: List of bill records
+        """
+        key = sheet_name or config.SHEET_NAME
+        with self._bills_cache_lock:
+            cached = self._bills_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < _READ_CACHE_TTL_SECONDS:
+                return cached[1]
+
+            try:
+                records = list(self.iter_bills(sheet_name))
+            except Exception as e:
+                raise Exception(f'Error retrieving bills: {str(e)}')
+
+            self._bills_cache[key] = (time.monotonic(), records)
+            return records
+
     def initialize_sheet(self, sheet_name=None):
         """
         Initialize a new sheet with headers
@@ -158,6 +618,9 @@ class GoogleSheetsIntegration:
             dict: Validation result
         """
         try:
+            # A connection test has to round-trip: the memoized handle
+            # serves title/url from cached properties forever, masking
+            # revoked credentials or lost connectivity
             spreadsheet = self.client.open_by_key(self.spreadsheet_id)
             return {
                 'success': True,